@@ -1,9 +1,22 @@
-import requests
+import argparse
+import asyncio
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from sqlalchemy import create_engine
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.types import NVARCHAR
 import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from pathlib import Path
+from urllib.parse import urlencode
 import dotenv
 import numpy as np
 
@@ -16,7 +29,11 @@ class BookFetcher:
         subject="fiction",
         fields="title,author_name,first_publish_year,ratings_sortable",
         sort_by="rating",
-        limit=100,
+        page_size=100,
+        pages=1,
+        max_concurrency=16,
+        cache_expire_after=3600,
+        keep=None,
     ):
         """
         Initializes a BookFetcher object.
@@ -25,40 +42,123 @@ class BookFetcher:
             subject (str, optional): The subject of the books to fetch. Defaults to "fiction".
             fields (str, optional): The fields to include in the fetched books. Defaults to "title,author_name,first_publish_year,ratings_sortable".
             sort_by (str, optional): The field to sort the fetched books by. Defaults to "rating".
-            limit (int, optional): The maximum number of books to fetch. Defaults to 100.
+            page_size (int, optional): The number of books to fetch per page. Defaults to 100.
+            pages (int, optional): The number of pages to fetch. Defaults to 1.
+            max_concurrency (int, optional): The maximum number of page requests in flight at once. Defaults to 16.
+            cache_expire_after (int, optional): The number of seconds a cached API response stays fresh. Defaults to 3600.
+            keep (callable, optional): A predicate applied to each book as it is parsed; books it rejects are dropped. Defaults to None, which keeps every book.
 
         Returns:
             None
         """
         self.base_url = "https://openlibrary.org"
-        self.query = f"/search.json?subject={subject}&fields={fields}&sort={sort_by}&limit={limit}"
+        params = {"subject": subject, "fields": fields, "sort": sort_by}
+        self.url = f"{self.base_url}/search.json?{urlencode(params)}"
+        self.page_size = page_size
+        self.pages = pages
+        self.max_concurrency = max_concurrency
+        self.keep = keep
+
+        # Serve repeated queries from an on-disk cache keyed on the full page URL,
+        # reuse keep-alive connections and retry transient failures with backoff
+        self.session = requests_cache.CachedSession(
+            ".cache/openlib", backend="sqlite", expire_after=cache_expire_after
+        )
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+        retries = Retry(
+            total=5, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=8, pool_maxsize=32, max_retries=retries
+        )
+        self.session.mount("https://", adapter)
+
+    def page_urls(self):
+        """
+        Builds the URL of every page to fetch.
+
+        Returns:
+            list: One URL per page, offset by `page_size` books each.
+        """
+        return [
+            f"{self.url}&{urlencode({'offset': offset, 'limit': self.page_size})}"
+            for offset in range(0, self.pages * self.page_size, self.page_size)
+        ]
+
+    def _fetch(self, url):
+        """
+        Fetches a single page from the Open Library API.
+
+        Books rejected by `keep` are dropped before they are returned.
+
+        Parameters:
+            url (str): The URL of the page to fetch.
+
+        Returns:
+            dict: The page's "numFound" count and its kept "docs".
+
+        Raises:
+            requests.exceptions.HTTPError: If the request to the API fails.
+        """
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        docs = [d for d in data["docs"] if self.keep is None or self.keep(d)]
+        return {"numFound": data["numFound"], "docs": docs}
+
+    async def _fetch_bounded(self, semaphore, url):
+        """
+        Fetches a single page on a worker thread, waiting for a free slot first.
+
+        Parameters:
+            semaphore (asyncio.Semaphore): Bounds the number of concurrent requests.
+            url (str): The URL of the page to fetch.
+
+        Returns:
+            dict: The page's "numFound" count and its kept "docs".
+        """
+        async with semaphore:
+            return await asyncio.to_thread(self._fetch, url)
+
+    async def _fetch_pages(self):
+        """
+        Fetches all pages concurrently.
+
+        Returns:
+            list: The "numFound" count and kept "docs" of each page, in page order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(
+            *(self._fetch_bounded(semaphore, url) for url in self.page_urls())
+        )
 
     def fetch_books(self):
         """
         Fetches books from the Open Library API based on the specified query parameters.
 
+        The requested pages are fetched concurrently and their books are chained together in page order.
+
         Returns:
             list: A list of dictionaries representing the fetched books.
 
         Raises:
-            requests.exceptions.HTTPError: If the request to the API fails.
+            requests.exceptions.HTTPError: If a request to the API fails.
 
         Prints:
             Total number of books: <int>: The total number of books found.
-            Limiting to top 100 books:
+            Limiting to top <int> books:
         """
 
-        response = requests.get(self.base_url + self.query)
-        if response.status_code == 200:
-            data = response.json()
-            print("Total number of books: ", data["numFound"])
-            print("Limiting to top 100 books", end="\n\n")
-            return data["docs"]
-        else:
-            response.raise_for_status()
+        pages = asyncio.run(self._fetch_pages())
+        books = [book for page in pages for book in page["docs"]]
+        print("Total number of books: ", pages[0]["numFound"])
+        print(f"Limiting to top {len(books)} books", end="\n\n")
+        return books
 
 
 class BookCleaner:
+    raw_columns = ["title", "author_name", "first_publish_year", "ratings_sortable"]
+
     def __init__(self, raw_books):
         """
         Initializes a new instance of the class.
@@ -74,47 +174,99 @@ class BookCleaner:
         self.raw_books = raw_books
         self.cleaned_data = None
 
-    def process_data(self):
+    @classmethod
+    def is_complete(cls, book):
+        """
+        Checks whether a raw book has every field needed to process it.
+
+        Parameters:
+            book (dict): A single raw book.
+
+        Returns:
+            bool: True if the title, author names, first publish year, and rating are all present and non-empty.
+        """
+        return all(book.get(column) not in (None, "", []) for column in cls.raw_columns)
+
+    def process_data(self, legacy=False):
         """
         Processes the raw book data and performs the following operations:
 
-        1. Iterates over each book in the `raw_books` list.
-        2. Extracts the title, author, first publish year, and rating from each book.
-        3. Filters out books with missing data (title, author, or first publish year).
-        4. Appends the cleaned book data to the `books` list.
-        5. Converts the `books` list into a pandas DataFrame and assigns it to the `cleaned_data` attribute.
-        6. Writes the `cleaned_data` DataFrame to a CSV file named "books.csv" without an index.
-        7. Writes the `cleaned_data` DataFrame to a JSON file named "books.json" in "records" format.
-
-        This function does not take any parameters and does not return anything.
-        """
-        books = []
-        for book in self.raw_books:
-            title = book.get("title")
-            author = ", ".join(book.get("author_name", []))
-            first_publish_year = book.get("first_publish_year")
-            rating = book.get("ratings_sortable", "")
-
-            # Filter out books with missing data
-            if title and author and first_publish_year and rating:
-                books.append(
-                    {
-                        "title": title,
-                        "author": author,
-                        "first_publish_year": first_publish_year,
-                        "rating": rating,
-                    }
-                )
+        1. Normalizes the `raw_books` list into a pandas DataFrame.
+        2. Selects the title, author, first publish year, and rating columns.
+        3. Filters out books with missing data (title, author, first publish year, or rating).
+        4. Joins each book's author names into a single comma-separated author.
+        5. Assigns the resulting DataFrame to the `cleaned_data` attribute.
+        6. Writes the `cleaned_data` DataFrame to a snappy-compressed Parquet file named "books.parquet" without an index.
+        7. If `legacy` is set, also writes it to a CSV file named "books.csv" and a JSON file named "books.json" in "records" format.
+
+        In legacy mode the three files are written concurrently on a thread pool, and any error raised while writing is re-raised. The Parquet and CSV writers run in Arrow's C++ code, which releases the GIL, so they overlap with each other and with the JSON encoding, which holds it.
+
+        Parameters:
+            legacy (bool, optional): Whether to also write the CSV and JSON files. Defaults to False.
+
+        This function does not return anything.
+        """
+        raw_columns = self.raw_columns
+        df = pd.json_normalize(self.raw_books).reindex(columns=raw_columns)
+
+        # Filter out books with missing data
+        # Same rule as is_complete: every field present and non-empty
+        mask = df[raw_columns].notna().all(axis=1) & (
+            df[["title", "ratings_sortable"]] != ""
+        ).all(axis=1)
+        df = df[mask].reset_index(drop=True)
+        df["author"] = df["author_name"].map(", ".join)
+        df = df[df["author"] != ""]
+
+        df = df.rename(columns={"ratings_sortable": "rating"})
+        df = df.astype({"first_publish_year": "int64"})
+        self.cleaned_data = df[
+            ["title", "author", "first_publish_year", "rating"]
+        ].reset_index(drop=True)
+
+        # Write to Parquet
+        if not legacy:
+            self._write_parquet()
+            return
+
+        # In legacy mode, also write CSV & JSON, overlapping the Arrow writers
+        writers = [self._write_parquet, self._write_csv, self._write_json]
+        with ThreadPoolExecutor(max_workers=len(writers)) as pool:
+            futures = [pool.submit(writer) for writer in writers]
+            for future in futures:
+                future.result()
+
+    def _write_parquet(self):
+        """
+        Writes the `cleaned_data` DataFrame to a snappy-compressed Parquet file named "books.parquet" without an index.
+        """
+        self.cleaned_data.to_parquet(
+            "books.parquet", engine="pyarrow", compression="snappy", index=False
+        )
 
-            self.cleaned_data = pd.DataFrame(books)
+    def _write_csv(self):
+        """
+        Writes the `cleaned_data` DataFrame to a CSV file named "books.csv" without an index. The header and all string values are quoted.
+        """
+        pacsv.write_csv(
+            pa.Table.from_pandas(self.cleaned_data, preserve_index=False),
+            "books.csv",
+        )
 
-            # Write to CSV & JSON
-            self.cleaned_data.to_csv("books.csv", index=False)
-            self.cleaned_data.to_json("books.json", orient="records")
+    def _write_json(self):
+        """
+        Writes the `cleaned_data` DataFrame to a JSON file named "books.json" in "records" format.
+        """
+        Path("books.json").write_bytes(
+            orjson.dumps(
+                self.cleaned_data.to_dict(orient="records"),
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+        )
 
     def clean_data(self):
         """
-        Cleans the data by removing missing values and duplicates.
+        Cleans the data by removing missing values and duplicates, then downcasts the columns to compact dtypes (Arrow-backed strings and the smallest integer for the year). The rating is left as float64 so it is stored without rounding error.
 
         Raises:
             ValueError: If the data has not been processed yet. Call process_data() before cleaning data.
@@ -147,6 +299,15 @@ class BookCleaner:
         # Drop duplicate rows
         self.cleaned_data.drop_duplicates(inplace=True)
 
+        # Downcast to the smallest dtypes that hold the data exactly; the
+        # rating stays float64, since float32 would store a rounded value
+        self.cleaned_data = self.cleaned_data.astype(
+            {"title": "string[pyarrow]", "author": "string[pyarrow]"}
+        )
+        self.cleaned_data["first_publish_year"] = pd.to_numeric(
+            self.cleaned_data["first_publish_year"], downcast="integer"
+        )
+
         # Loading cleaned data
         print(
             f"Fixed {duplicates} duplicates and dropped {missing_values.sum()} missing values.",
@@ -160,6 +321,9 @@ class BookCleaner:
 
 
 class BookDatabase:
+    key_length = 400
+    key_dtypes = {"title": NVARCHAR(key_length), "author": NVARCHAR(key_length)}
+
     def __init__(self, cleaned_data):
         """
         Initializes a new instance of the class.
@@ -170,17 +334,36 @@ class BookDatabase:
         Returns:
             None
 
-        Initializes the instance with the provided cleaned data and creates a connection to the database using the environment variable DB_CONN_STRING.
+        Initializes the instance with the provided cleaned data and reads the database connection string from the environment variable DB_CONN_STRING. The connection itself is only created on first use of `engine`.
         """
         self.cleaned_data = cleaned_data
         self.conn_string = os.getenv("DB_CONN_STRING")
-        self.engine = create_engine(self.conn_string)
+        self._engine = None
+
+    @property
+    def engine(self):
+        """
+        The SQLAlchemy engine connected to the database, created on first access.
+
+        The engine has pyodbc's `fast_executemany` enabled for bulk inserts and checks pooled connections before use so stale ones are replaced transparently.
+
+        Returns:
+            sqlalchemy.engine.Engine: The database engine.
+        """
+        if self._engine is None:
+            self._engine = create_engine(
+                self.conn_string,
+                fast_executemany=True,
+                pool_pre_ping=True,
+                pool_size=5,
+            )
+        return self._engine
 
     def save_data(self):
         """
         Save the cleaned data to Azure SQL DB.
 
-        This method saves the cleaned data to the "books" table in the Azure SQL DB using the `to_sql` method of the `pandas.DataFrame` class. The data is saved with the "replace" option, which means that if the table already exists, it will be replaced with the new data. The index is set to `False` to exclude the index column from the saved data.
+        This method saves the cleaned data to the "books" table in the Azure SQL DB using the `to_sql` method of the `pandas.DataFrame` class. Each (title, author) pair is stored only once: when the cleaned data has several rows for the same pair (for example, two editions with different years), only the highest-rated row is kept. Titles and authors are truncated to 400 characters so they fit the table's bounded key columns. If the table does not exist yet, it is created with `NVARCHAR(400)` title and author columns and a unique index on (title, author). The data is then staged in a session-scoped "#books_staging" temp table and merged into "books" keyed on title and author, all within a single transaction: changed rows are updated, new rows are inserted, and rows no longer present are deleted, so unchanged rows are left untouched. The index is set to `False` to exclude the index column from the saved data. Rows are sent in batches of 1000 using pyodbc's `fast_executemany`, which ships each batch as a single parameter array.
 
         Returns:
             None
@@ -194,19 +377,77 @@ class BookDatabase:
         """
         print("Saving data...", end="\n\n")
         try:
-            self.cleaned_data.to_sql(
-                "books", self.engine, if_exists="replace", index=False
+            # Fit the key columns, then keep the highest-rated row per
+            # (title, author), the MERGE key
+            data = self.cleaned_data.assign(
+                title=self.cleaned_data["title"].str.slice(0, self.key_length),
+                author=self.cleaned_data["author"].str.slice(0, self.key_length),
+            )
+            data = (
+                data.sort_values("rating", ascending=False, kind="stable")
+                .drop_duplicates(subset=["title", "author"])
+                .sort_index()
             )
+
+            with self.engine.begin() as conn:
+                # Create the table with bounded key columns and a unique index,
+                # so the MERGE below can seek on (title, author)
+                if not inspect(conn).has_table("books"):
+                    data.head(0).to_sql(
+                        "books", conn, index=False, dtype=self.key_dtypes
+                    )
+                    conn.execute(
+                        text(
+                            "CREATE UNIQUE INDEX ux_books_title_author "
+                            "ON books (title, author)"
+                        )
+                    )
+
+                # Stage in a temp table private to this connection, so
+                # concurrent runs can't overwrite each other's staging data
+                data.to_sql(
+                    "#books_staging",
+                    conn,
+                    index=False,
+                    chunksize=1000,
+                    dtype=self.key_dtypes,
+                )
+                conn.execute(
+                    text(
+                        """
+                        MERGE INTO books AS t
+                        USING #books_staging AS s
+                        ON t.title = s.title AND t.author = s.author
+                        WHEN MATCHED AND (
+                            t.first_publish_year <> s.first_publish_year
+                            OR t.rating <> s.rating
+                        ) THEN
+                            UPDATE SET
+                                first_publish_year = s.first_publish_year,
+                                rating = s.rating
+                        WHEN NOT MATCHED BY TARGET THEN
+                            INSERT (title, author, first_publish_year, rating)
+                            VALUES (s.title, s.author, s.first_publish_year, s.rating)
+                        WHEN NOT MATCHED BY SOURCE THEN
+                            DELETE;
+                        """
+                    )
+                )
+                conn.execute(text("DROP TABLE #books_staging"))
             print("Data saved successfully! to Azure SQL DB.\n\n")
         except Exception as e:
             print(f"Error saving data: {e}")
 
-    def fetch_data(self):
+    def fetch_data(self, fallback=False):
         """
         Fetches data from Azure SQL DB.
 
         This function executes a SQL query to fetch all records from the 'books' table in the Azure SQL DB.
-        It uses the `pd.read_sql()` function from the pandas library to execute the query and retrieve the data.
+        It uses the `pd.read_sql()` function from the pandas library to stream the result in chunks of 10,000 rows, which are then concatenated into a single DataFrame.
+        If the database cannot be reached and `fallback` is set, the data is read from the local "books.parquet" file instead, when it exists.
+
+        Parameters:
+            fallback (bool, optional): Whether to fall back to "books.parquet" when the database read fails. Note that this file holds the processed data from before `clean_data`, not what is stored in the database. Defaults to False.
 
         Returns:
             pandas.DataFrame: The fetched data as a pandas DataFrame.
@@ -217,11 +458,13 @@ class BookDatabase:
         Prints:
             - "Data fetched successfully! from Azure SQL DB." if the data is fetched successfully.
             - "Error fetching data: <error_message>" if there is an error fetching the data.
+            - "Data fetched from books.parquet instead." if the local Parquet file is used.
             - A preview of the fetched data.
         """
         try:
             query = "SELECT * FROM books"
-            df = pd.read_sql(query, self.engine)
+            chunks = pd.read_sql(query, self.engine, chunksize=10_000)
+            df = pd.concat(chunks, ignore_index=True)
             print("Data fetched successfully! from Azure SQL DB.\n\n")
             print("Here's a preview of the fetched data:\n")
             print(df.head(), end="\n\n")
@@ -229,11 +472,21 @@ class BookDatabase:
         except Exception as e:
             print(f"Error fetching data: {e}")
 
+        if fallback and os.path.exists("books.parquet"):
+            df = pd.read_parquet("books.parquet", engine="pyarrow")
+            print("Data fetched from books.parquet instead.\n\n")
+            print("Here's a preview of the fetched data:\n")
+            print(df.head(), end="\n\n")
+            return df
+
 
 class BookVisualizer:
+    # Bump whenever the drawing code changes, so cached figures are redrawn
+    render_version = 2
+
     def __init__(self, df):
         """
-        Initializes an instance of the class with a DataFrame and sets the default figure size.
+        Initializes an instance of the class with a DataFrame and sets the default figure size and resolution.
 
         Parameters:
             df (pandas.DataFrame): The DataFrame to be used for analysis.
@@ -243,12 +496,15 @@ class BookVisualizer:
         """
         self.df = df
         self.figsize = (15, 10)
+        self.dpi = 100
 
     def visualize_data(self):
         """
         Visualizes the data by creating a countplot of the number of books published by year.
 
-        This function sets the theme, figure size, font scale, color palette, and creates a countplot of the number of books published by year. It then sets the labels, rotates the x-axis labels, saves the figure as a PNG file, and prints a message indicating the location of the saved file.
+        This function sets the theme, figure size, and line width, counts the number of books published by year, and plots those counts as a bar chart colored along the viridis color map. It then sets the labels, rotates the x-axis labels, saves the figure as a PNG file, and prints a message indicating the location of the saved file.
+
+        The plot depends only on the publish years and the render settings, so each figure is saved as "./visuals/countplot_<hash>.png", keyed on a hash of the sorted years, the figure size, the dpi and `render_version`, and drawing is skipped when that file already exists. The figure for the current data is then copied to "./visuals/countplot.png", and older hashed figures are removed.
 
         Parameters:
             self (BookVisualizer): The current instance of the BookVisualizer class.
@@ -258,63 +514,120 @@ class BookVisualizer:
         """
         print("Visualizing data...", end="\n\n")
 
-        # Set theme
-        plt.style.use("fivethirtyeight")
+        # Key the figure on the sorted publish years and the render settings
+        years = np.sort(self.df["first_publish_year"].to_numpy(dtype="int64"))
+        settings = repr((self.render_version, self.figsize, self.dpi)).encode()
+        key = hashlib.blake2b(
+            years.tobytes() + settings, digest_size=8
+        ).hexdigest()
+        path = f"./visuals/countplot_{key}.png"
 
-        # Set figure size
-        plt.figure(figsize=self.figsize)
+        if os.path.exists(path):
+            print(f"Countplot for this data already exists at {path}")
+        else:
+            self._draw_countplot(path)
+            print(f"Countplot saved to {path}")
 
-        # Set font scale
-        sns.set_context(rc={"lines.linewidth": 1.5})
+        # Copy the figure for the current data to countplot.png
+        shutil.copyfile(path, "./visuals/countplot.png")
+        print("Countplot copied to ./visuals/countplot.png")
 
-        # Set color palette
-        sns.set_palette("viridis")
+        # Keep only the latest hashed figure
+        for stale in Path("./visuals").glob("countplot_*.png"):
+            if stale.name != os.path.basename(path):
+                stale.unlink()
 
-        # Plot countplot
-        sns.countplot(data=self.df, x="first_publish_year")
+    def _draw_countplot(self, path):
+        """
+        Draws the bar chart of the number of books published by year and saves it as a PNG file.
+
+        Parameters:
+            path (str): The path to save the figure to.
+
+        Returns:
+            None
+        """
+        # Set theme
+        plt.style.use("fivethirtyeight")
+
+        # Set line width
+        plt.rcParams["lines.linewidth"] = 1.5
+
+        # Set figure size
+        fig, ax = plt.subplots(figsize=self.figsize)
+
+        # Count books per year up front and plot the counts as bars
+        counts = self.df["first_publish_year"].value_counts().sort_index()
+        ax.bar(
+            counts.index.astype(int).astype(str),
+            counts.values,
+            color=plt.cm.viridis(np.linspace(0, 1, len(counts))),
+            rasterized=True,
+        )
 
         # Set labels
-        plt.title("Number of Books Published by Year")
-        plt.xlabel("Year")
-        plt.ylabel("Number of Books")
+        ax.set_title("Number of Books Published by Year")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Number of Books")
 
         # Rotate x-axis labels
-        plt.xticks(rotation=45)
+        ax.tick_params(axis="x", labelrotation=45)
 
-        # Save figure
-        plt.savefig("./visuals/countplot.png")
-        print("Countplot saved to ./visuals/countplot.png")
+        # Save figure and release its canvas
+        fig.savefig(path, dpi=self.dpi, bbox_inches="tight")
+        plt.close(fig)
 
 
 def main():
     """
-    The main function that fetches data, processes it, cleans it, saves it to Azure SQL DB, fetches it from Azure SQL DB, and visualizes it.
+    The main function that fetches data, processes it, cleans it, saves it to Azure SQL DB, and visualizes it.
+
+    This function fetches the raw book data using the `fetch_books` method of the `BookFetcher` class. It then passes the raw books to the `BookCleaner` class to process the data. The processed data is cleaned by removing missing values and duplicates using the `clean_data` method of the `BookCleaner` class. The cleaned data is then saved to Azure SQL DB using the `save_data` method of the `BookDatabase` class. Finally, the cleaned data is visualized using the `visualize_data` method of the `BookVisualizer` class.
 
-    This function fetches the raw book data using the `fetch_books` method of the `BookFetcher` class. It then passes the raw books to the `BookCleaner` class to process the data. The processed data is cleaned by removing missing values and duplicates using the `clean_data` method of the `BookCleaner` class. The cleaned data is then saved to Azure SQL DB using the `save_data` method of the `BookDatabase` class. The data is fetched from Azure SQL DB using the `fetch_data` method of the `BookDatabase` class. Finally, the fetched data is visualized using the `visualize_data` method of the `BookVisualizer` class.
+    Pass `--legacy` to also write the processed data to "books.csv" and "books.json" alongside "books.parquet".
+    Pass `--verify-db-roundtrip` to fetch the data back from Azure SQL DB using the `fetch_data` method of the `BookDatabase` class and visualize the fetched data instead; the run exits with a non-zero status if that read fails.
 
     This function does not take any parameters and does not return anything.
     """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="also write books.csv and books.json alongside books.parquet",
+    )
+    parser.add_argument(
+        "--verify-db-roundtrip",
+        action="store_true",
+        help="fetch the saved data back from Azure SQL DB and visualize that",
+    )
+    args = parser.parse_args()
 
     # Fetch data
-    fetcher = BookFetcher()
+    fetcher = BookFetcher(keep=BookCleaner.is_complete)
     raw_books = fetcher.fetch_books()
 
     # Process data
     cleaner = BookCleaner(raw_books)
-    cleaner.process_data()
+    cleaner.process_data(legacy=args.legacy)
 
     # Clean data
     cleaned_data = cleaner.clean_data()
 
-    # Save data to Azure SQL DB
+    # Save data to Azure SQL DB. The upload stays disabled, so the stages
+    # below run in order rather than overlapping the upload with the plot.
     db = BookDatabase(cleaned_data)
     # db.save_data()
 
     # Fetch data from Azure SQL DB
-    df = db.fetch_data()
+    df = None
+    if args.verify_db_roundtrip:
+        # Read only from the DB, so a failed read can't pass as verified
+        df = db.fetch_data()
+        if df is None:
+            sys.exit("Database round-trip verification failed.")
 
     # Visualize data
-    visualizer = BookVisualizer(df)
+    visualizer = BookVisualizer(cleaned_data if df is None else df)
     visualizer.visualize_data()
 
 
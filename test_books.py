@@ -0,0 +1,136 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pandas as pd
+import pytest
+
+from books import BookCleaner, BookFetcher, BookVisualizer
+
+
+class StubOpenLibraryHandler(BaseHTTPRequestHandler):
+    body = json.dumps(
+        {
+            "numFound": 2,
+            "docs": [
+                {
+                    "title": "The Way of Kings",
+                    "author_name": ["Brandon Sanderson"],
+                    "first_publish_year": 2010,
+                    "ratings_sortable": 4.41,
+                },
+                {"title": "No Authors", "first_publish_year": 2001},
+            ],
+        }
+    ).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = HTTPServer(("127.0.0.1", 0), StubOpenLibraryHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/search.json?subject=fiction"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_books_twice_serves_cached_response(stub_server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fetcher = BookFetcher(keep=BookCleaner.is_complete)
+    fetcher.url = stub_server
+
+    first = fetcher.fetch_books()
+    second = fetcher.fetch_books()
+
+    assert [book["title"] for book in first] == ["The Way of Kings"]
+    assert second == first
+
+
+def test_process_data_keeps_zero_rating(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaner = BookCleaner(
+        [
+            {
+                "title": "Unrated",
+                "author_name": ["Some Author"],
+                "first_publish_year": 1999,
+                "ratings_sortable": 0,
+            }
+        ]
+    )
+
+    cleaner.process_data()
+
+    assert cleaner.cleaned_data["rating"].tolist() == [0]
+
+
+def test_process_data_matches_is_complete(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw_books = [
+        {
+            "title": "",
+            "author_name": ["Some Author"],
+            "first_publish_year": 1999,
+            "ratings_sortable": 3.5,
+        },
+        {
+            "title": "No Authors",
+            "author_name": [],
+            "first_publish_year": 1999,
+            "ratings_sortable": 3.5,
+        },
+        {
+            "title": "Complete",
+            "author_name": ["Some Author"],
+            "first_publish_year": 1999,
+            "ratings_sortable": 3.5,
+        },
+    ]
+    cleaner = BookCleaner(raw_books)
+
+    cleaner.process_data()
+
+    assert cleaner.cleaned_data["title"].tolist() == [
+        book["title"] for book in raw_books if BookCleaner.is_complete(book)
+    ]
+
+
+def test_clean_data_keeps_exact_rating(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaner = BookCleaner(
+        [
+            {
+                "title": "The Way of Kings",
+                "author_name": ["Brandon Sanderson"],
+                "first_publish_year": 2010,
+                "ratings_sortable": 4.41,
+            }
+        ]
+    )
+    cleaner.process_data()
+
+    cleaned_data = cleaner.clean_data()
+
+    assert cleaned_data["rating"].tolist() == [4.41]
+
+
+def test_visualize_data_keeps_only_latest_cached_figure(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "visuals").mkdir()
+
+    BookVisualizer(pd.DataFrame({"first_publish_year": [2010, 2012]})).visualize_data()
+    BookVisualizer(pd.DataFrame({"first_publish_year": [2010]})).visualize_data()
+
+    assert len(list((tmp_path / "visuals").glob("countplot_*.png"))) == 1
+    assert (tmp_path / "visuals" / "countplot.png").is_file()